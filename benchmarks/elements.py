@@ -0,0 +1,56 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+"""
+Time and memory needed to construct scenes of many elements.
+
+    python benchmarks/elements.py --num 100000
+"""
+
+import argparse
+import time
+
+from dynfigure import *
+from dynfigure.elements import *
+
+import numpy as np
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def build(X, style):
+    scene = Scene()
+    scene.put([Circle(x, 1, style) for x in X])
+    return scene
+
+
+def main(num, repeats):
+    np.random.seed(4242)
+    X = np.random.randn(num, 2)
+    style = Style(color='color3', fill_color='color3!0.5!white', line_width=0.5)
+
+    timings = []
+    for _ in range(repeats):
+        start = time.time()
+        build(X, style)
+        timings.append(time.time() - start)
+    print('construct %i elements: %.3f s (best of %i)' % (num, min(timings), repeats))
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+        scene = build(X, style)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('memory: %.1f MB, %i bytes per element' % (current / 1e6, current // len(scene.elements)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num', type=int, default=100000, help='number of elements')
+    parser.add_argument('--repeats', type=int, default=3, help='number of measurements')
+    args = parser.parse_args()
+    main(args.num, args.repeats)
@@ -0,0 +1,74 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+"""
+Time static groups against drawing them directly and check both give the same frames.
+
+    python benchmarks/layers.py --num 3000 --frames 50
+"""
+
+import argparse
+import time
+
+from dynfigure import *
+from dynfigure.elements import *
+
+import numpy as np
+import PIL.Image
+
+# rounding of the cached layers
+TOLERANCE = 4
+
+
+def build(X, sprites, static):
+    scene = Scene()
+    background = Group(static=static)
+    for k, x in enumerate(X):
+        style = Style(color='color%i' % (k % 17 + 1), fill_color='color%i!0.5!white' % (k % 17 + 1),
+                      opacity=np.random.randint(64, 256))
+        background.put(Circle(x, np.random.uniform(0.1, 0.5), style))
+        if k % (len(X) // len(sprites)) == 0:
+            background.put(Image(sprites[k % len(sprites)], top_left=np.random.randint(0, 400, 2)))
+    marker = Circle((0, 0), 1, Style(color='black', fill_color='red'))
+    scene.put([background, marker])
+    return scene, marker
+
+
+def render(X, sprites, static, frames):
+    np.random.seed(4242)
+    scene, marker = build(X, sprites, static)
+    cam = camera.Camera2D(width=500, height=500)
+
+    images, timings = [], []
+    for t in range(frames):
+        marker.position = [np.cos(t / 5.), np.sin(t / 5.)]
+        start = time.time()
+        images.append(np.asarray(cam.render(scene), dtype=int))
+        timings.append(time.time() - start)
+    return images, np.median(timings)
+
+
+def main(num, frames):
+    np.random.seed(4242)
+    X = np.random.randn(num, 2) * 40
+    # semi-transparent sprites
+    sprites = [PIL.Image.fromarray(np.random.randint(0, 256, (30, 40, 4)).astype(np.uint8), 'RGBA')
+               for _ in range(4)]
+
+    plain, plain_time = render(X, sprites, False, frames)
+    static, static_time = render(X, sprites, True, frames)
+    diff = max(np.abs(a - b).max() for a, b in zip(plain, static))
+
+    print('plain: %.1f ms, static: %.1f ms per frame' % (plain_time * 1e3, static_time * 1e3))
+    print('max difference: %i' % diff)
+    if diff > TOLERANCE:
+        raise SystemExit('static groups differ from drawing them directly')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num', type=int, default=3000, help='number of circles')
+    parser.add_argument('--frames', type=int, default=50, help='number of frames')
+    args = parser.parse_args()
+    main(args.num, args.frames)
@@ -1,9 +1,11 @@
 from color import Color
 from coordinate import Coordinate
 from style import Style
+from stats import Stats
 from scope import Scope
 from coordinate_system import CoordinateSystem, get_coordinate_system
 
 import camera
 import ease
-import exporter
\ No newline at end of file
+import exporter
+import pipeline
\ No newline at end of file
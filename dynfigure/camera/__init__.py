@@ -1 +1,2 @@
-from camera2d import Camera2D
\ No newline at end of file
+from camera2d import Camera2D
+from renderer import register_renderer
\ No newline at end of file
@@ -3,16 +3,45 @@
 # Author: Patrick Wieschollek <mail@patwie.com>
 
 
-from abc import abstractmethod, ABCMeta
+from abc import abstractmethod, abstractproperty, ABCMeta
+import weakref
 import six
 import numpy as np
 import PIL
 import PIL.Image
 import aggdraw
 from ..color import Color
+from ..canvas import new_canvas
+from ..stats import timer
+from .renderer import get_renderer
+from .tracking import ChangeTracker, signatures, unchanged
 
 __all__ = ['BaseCamera']
 
+# attributes of BaseCamera.__reset which are not pickled
+_LOCAL_STATE = ('img', 'ctx',
+                '_BaseCamera__tracker', '_BaseCamera__previous', '_BaseCamera__previous_background',
+                '_BaseCamera__scratch', '_BaseCamera__layers', '_BaseCamera__transforms',
+                '_BaseCamera__projections', '_BaseCamera__rasterizing',
+                '_BaseCamera__buffers', '_BaseCamera__next_buffer')
+
+
+def _timed(stats, element_type, renderers):
+    """Wrap renderers to record their time, including nested elements of groups
+    """
+    name = 'draw %s' % element_type.__name__
+    draw, draw_batch = renderers
+
+    def timed_draw(camera, obj):
+        with stats.timer(name):
+            draw(camera, obj)
+
+    def timed_draw_batch(camera, batch):
+        with stats.timer(name, len(batch)):
+            draw_batch(camera, batch)
+
+    return timed_draw, timed_draw_batch if draw_batch is not None else None
+
 
 @six.add_metaclass(ABCMeta)
 class BaseCamera(object):
@@ -20,7 +49,7 @@ class BaseCamera(object):
 
     def __init__(self, m=1, width=1920, height=1080, pc=None,
                  background_color=Color('white'),
-                 verbose=False):
+                 verbose=False, buffers=0, incremental=False, stats=None):
         """Abstract Camera class
 
         Args:
@@ -30,6 +59,13 @@ class BaseCamera(object):
             pc (TYPE, optional): principal point of camera
             background_color (TYPE, optional): background_color
             verbose (bool, optional): print debug information during rendering
+            buffers (int, optional): number of pre-allocated canvases which are reused in turn,
+                0 allocates a new canvas for each frame. A returned frame is only valid until
+                the camera rendered `buffers` more frames.
+            incremental (bool, optional): only repaint the screen regions of elements which
+                changed since the last frame. Returned frames must not be modified then.
+            stats (Stats, optional): collect timings of rendering, drawing per element type
+                and flushing
         """
         super(BaseCamera, self).__init__()
         self.__height = height
@@ -43,9 +79,47 @@ class BaseCamera(object):
 
         self.background_color = background_color
         self.verbose = verbose
+        self.incremental = incremental
+        self.stats = stats
+
+        if buffers == 1:
+            raise ValueError('frame buffers need to be at least double-buffered')
+        self.__num_buffers = buffers
 
+        self.__reset()
         self.setup()
 
+    def __reset(self):
+        """(Re-)create canvases and caches, which are local to the rendering process
+        """
+        self.img, self.ctx = None, None
+
+        self.__tracker = ChangeTracker()
+        self.__previous = None
+        self.__previous_background = None
+        self.__scratch = None
+        self.__layers = weakref.WeakKeyDictionary()
+        self.__transforms = weakref.WeakKeyDictionary()
+        self.__projections = weakref.WeakKeyDictionary()
+        self.__rasterizing = False
+
+        self.__buffers = []
+        self.__next_buffer = 0
+        for _ in range(self.__num_buffers):
+            img = new_canvas(self.__width, self.__height, self.background_color.rgb)
+            self.__buffers.append((img, aggdraw.Draw(img)))
+
+    def __getstate__(self):
+        # e.g. when sending the camera to worker processes
+        state = self.__dict__.copy()
+        for key in _LOCAL_STATE:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__reset()
+
     @property
     def pc(self):
         """Return principal camera point (screen space)
@@ -90,74 +164,315 @@ class BaseCamera(object):
 
     # painting methods
     def render(self, scene):
-        """Summary
+        """Render a scene
 
         Args:
-            scene (TYPE): Description
+            scene (Group): scene to draw
 
         Returns:
-            TYPE: Description
+            PIL.Image: rendered frame
         """
+        with timer(self.stats, 'render'):
+            return self._render(scene)
+
+    def _render(self, scene):
+        region, elements = None, None
+        if self.incremental:
+            region, elements = self._changed_region(scene)
+
+        if len(self.__buffers) > 0:
+            self.img, self.ctx = self.__buffers[self.__next_buffer]
+            if region is not None:
+                self.img.paste(self.__previous)
+        elif region is not None:
+            self.img = new_canvas(self.__width, self.__height, self.background_color.rgb)
+            self.img.paste(self.__previous)
+        else:
+            self.img = new_canvas(self.__width, self.__height, self.background_color.rgb)
+            self.ctx = aggdraw.Draw(self.img)
 
-        self.img = PIL.Image.new("RGBA", (self.__width, self.__height), self.background_color.rgb)
-        self.ctx = aggdraw.Draw(self.img)
+        if region is None:
+            if len(self.__buffers) > 0:
+                self.ctx.clear(self.background_color.rgb)
+            scene.draw(self)
+        elif len(region) > 0:
+            self._render_region(elements, region)
+
+        if len(self.__buffers) > 0:
+            # renderers might have replaced the drawing context
+            self.__buffers[self.__next_buffer] = (self.img, self.ctx)
+            self.__next_buffer = (self.__next_buffer + 1) % len(self.__buffers)
 
-        scene.draw(self)
+        self.__previous = self.img
+        self.__previous_background = self.background_color.rgb
         return self.img
 
+    def _changed_region(self, scene):
+        """Return the screen region which needs to be repainted since the last frame
+
+        Returns:
+            tuple: region (x0, y0, x1, y1), () if nothing changed or None for the entire frame,
+                and all non-group elements of the scene
+        """
+        elements = scene.leaves() if hasattr(scene, 'leaves') else [scene]
+        dirty = self.__tracker.update(self, elements)
+
+        if dirty is None or self.__previous is None:
+            return None, elements
+        if self.__previous_background != self.background_color.rgb:
+            return None, elements
+        if len(dirty) == 0:
+            return (), elements
+
+        dirty = np.array(dirty)
+        x0, y0 = np.floor(dirty[:, :2].min(axis=0)).astype(int).tolist()
+        x1, y1 = np.ceil(dirty[:, 2:].max(axis=0)).astype(int).tolist()
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.__width), min(y1, self.__height)
+
+        if x0 >= x1 or y0 >= y1:
+            return (), elements
+        if (x1 - x0) * (y1 - y0) > self.__width * self.__height // 2:
+            # repainting most of the frame is cheaper in one go
+            return None, elements
+        return (x0, y0, x1, y1), elements
+
+    def _render_region(self, elements, region):
+        """Repaint a region of the current frame
+
+        The elements overlapping the region are drawn onto a full-sized scratch canvas
+        so they are rasterized exactly as in a full render.
+
+        Args:
+            elements (list): all non-group elements of the scene in drawing order
+            region (tuple): screen region (x0, y0, x1, y1)
+        """
+        x0, y0, x1, y1 = region
+        frame, ctx = self.img, self.ctx
+
+        if self.__scratch is None:
+            img = PIL.Image.new("RGBA", (self.__width, self.__height), self.background_color.rgb)
+            self.__scratch = (img, aggdraw.Draw(img))
+        self.img, self.ctx = self.__scratch
+        self.ctx.clear(self.background_color.rgb)
+
+        def overlaps(bounds):
+            return bounds[0] < x1 and bounds[2] > x0 and bounds[1] < y1 and bounds[3] > y0
+
+        self.draw_elements([obj for obj in elements if overlaps(self.__tracker.bounds(obj))])
+        self.flush()
+
+        frame.paste(self.img.crop(region), (x0, y0))
+        self.__scratch = (self.img, self.ctx)
+        self.img, self.ctx = frame, ctx
+
     def flush(self):
+        with timer(self.stats, 'flush'):
+            self.ctx.flush()
+
+    def draw_layer(self, group):
+        """Composite the cached rasterization of a static group onto the frame
+
+        The group is rasterized again whenever the group, one of its elements, their styles
+        or coordinate systems, the camera or the background changed.
+
+        Args:
+            group (Group): static group
+        """
+        # styles and coordinate systems do not touch the elements using them
+        key = (group._revision, self.background_color.rgb, self.matrix)
+        current = signatures(group.leaves())
+
+        cached = self.__layers.get(group)
+        if (cached is None or cached[0][:2] != key[:2] or cached[0][2] is not key[2] or
+                not unchanged(cached[1], current)):
+            cached = (key, current) + self._rasterize(group)
+            self.__layers[group] = cached
+
+        layer, box = cached[2:]
+        if layer is None:
+            return
+
         self.ctx.flush()
+        self.composite(layer, box[:2])
+        self.ctx = aggdraw.Draw(self.img)
+
+    def composite(self, img, dest, source=None):
+        """Alpha-composite an rgba image onto the current canvas in place
+
+        Renderers need to flush the drawing context before and recreate it afterwards.
+
+        Args:
+            img (PIL.Image): rgba image with straight alpha
+            dest (tuple): top-left corner (x, y) on the canvas
+            source (tuple, optional): region (x0, y0, x1, y1) of the image, all by default
+        """
+        if source is None:
+            source = (0, 0) + img.size
+        if not self.__rasterizing:
+            self.img.alpha_composite(img, dest, source)
+            return
+
+        # layers hold colors blended over the background, as aggdraw blends them, and the
+        # coverage as alpha, see `_rasterize`. Images are blended the same way.
+        box = (dest[0], dest[1], dest[0] + source[2] - source[0], dest[1] + source[3] - source[1])
+        region = self.img.crop(box)
+        coverage = PIL.Image.new('RGBA', region.size, (0, 0, 0, 0))
+        coverage.putalpha(region.getchannel('A'))
+        coverage.alpha_composite(img, (0, 0), source)
+
+        region.putalpha(255)
+        region.alpha_composite(img, (0, 0), source)
+        region.putalpha(coverage.getchannel('A'))
+        self.img.paste(region, box[:2])
+
+    def _rasterize(self, group):
+        """Draw a group onto a transparent canvas
+
+        Returns:
+            tuple: rgba layer with straight alpha and its screen region (x0, y0, x1, y1),
+                Nones if the group covers no pixel
+        """
+        img, ctx, rasterizing = self.img, self.ctx, self.__rasterizing
+
+        # aggdraw blends colors regardless of the alpha underneath, so the colors of the
+        # layer match the group drawn over the background while alpha holds the coverage
+        self.img = PIL.Image.new("RGBA", (self.__width, self.__height), self.background_color.rgb[:3] + (0,))
+        self.ctx = aggdraw.Draw(self.img)
+        self.__rasterizing = True
+        try:
+            group.draw(self)
+        finally:
+            self.__rasterizing = rasterizing
+        layer = self.img
+
+        self.img, self.ctx = img, ctx
+
+        box = layer.getchannel('A').getbbox()
+        if box is None:
+            return None, None
+
+        # remove the background contribution once, compositing then only needs the
+        # colors of the group itself
+        colors = np.asarray(layer.crop(box), dtype=float)
+        alpha = colors[:, :, 3:]
+        base = np.array(self.background_color.rgb[:3], dtype=float)
+        premultiplied = colors[:, :, :3] - base * (1. - alpha / 255.)
+        straight = np.where(alpha > 0, premultiplied * 255. / np.maximum(alpha, 1.), 0.)
+
+        layer = np.concatenate([straight, alpha], axis=2)
+        layer = np.clip(np.round(layer), 0, 255).astype(np.uint8)
+        return PIL.Image.fromarray(layer, 'RGBA'), box
+
+    def draw_elements(self, elements):
+        """Draw elements in the given order
+
+        Runs of consecutive elements of the same type are handed to the batch renderer
+        of that type if one is registered.
+
+        Args:
+            elements (list): elements to draw
+        """
+        batch, batch_type = [], None
+        for element in elements:
+            element_type = type(element)
+            if element_type is not batch_type:
+                if len(batch) > 0:
+                    self._draw_batch(batch)
+                    batch = []
+                batch_type = element_type
+                renderers = self.renderer(element_type)
+            if renderers[1] is not None:
+                batch.append(element)
+            else:
+                if self.verbose:
+                    print('Camera.draw {}'.format(element))
+                renderers[0](self, element)
+
+        if len(batch) > 0:
+            self._draw_batch(batch)
+
+    def _draw_batch(self, batch):
+        if self.verbose:
+            for element in batch:
+                print('Camera.draw {}'.format(element))
+        self.renderer(type(batch[0]))[1](self, batch)
 
     def draw(self, obj):
-        # TODO: refactor
-        tname = obj.__class__.__name__
         if self.verbose:
             print('Camera.draw {}'.format(obj))
+        self.renderer(type(obj))[0](self, obj)
 
-        if tname == 'Circle':
-            csys = obj.csys
-
-            p = csys.apply(obj.position)
-            r = csys.stretch(obj.radius)
+    def renderer(self, element_type):
+        """Return the renderers (draw, draw_batch) registered for an element type
 
-            if r.shape[0] == 1:
-                r = np.array([r[0], r[0]])
+        Args:
+            element_type (type): class of the element
+        """
+        renderers = get_renderer(element_type)
+        if renderers is None:
+            raise Exception('no renderer registered for element of type \'%s\'' % element_type.__name__)
+        if self.stats is not None:
+            renderers = _timed(self.stats, element_type, renderers)
+        return renderers
 
-            p = self.world2image(p)[0]
+    # projection methods
 
-            self.ctx.ellipse([p[0] - r[0], p[1] - r[1],
-                              p[0] + r[0], p[1] + r[1]], obj.style.pen, obj.style.brush)
-        elif tname == 'Image':
+    def transform(self, csys):
+        """Return the affine transformation from a coordinate system to screen space
 
-            self.ctx.flush()
+        The composition of the coordinate system and the camera matrix is cached and only
+        recomputed when one of both changes.
 
-            width, height = obj.img.size
+        Args:
+            csys (CoordinateSystem): coordinate system of world coordinates, None for
+                coordinates which were already transformed by their coordinate system
 
-            xy = obj.top_left.tolist()
-            xy = [xy[0], xy[1], xy[0] + width, xy[1] + height]
+        Returns:
+            np.ndarray[3, 3]: homogeneous transformation
+        """
+        if csys is None:
+            return self.matrix
+        csys_matrix, camera_matrix = csys.matrix, self.matrix
+        cached = self.__transforms.get(csys)
+        if cached is None or cached[0] is not csys_matrix or cached[1] is not camera_matrix:
+            cached = (csys_matrix, camera_matrix, np.dot(camera_matrix, csys_matrix))
+            self.__transforms[csys] = cached
+        return cached[2]
+
+    def project(self, csys, x):
+        """Map world coordinates of a coordinate system to screen coordinates
 
-            matched = PIL.Image.new("RGBA", self.img.size, (0, 255, 255, 0))
-            matched.paste(obj.img, xy, obj.img)
-            self.img = PIL.Image.alpha_composite(self.img, matched)
-            # self.img.paste(obj.img, xy)
+        Args:
+            csys (CoordinateSystem): coordinate system of world coordinates, see `transform`
+            x (np.ndarray[n, 2]): world coordinates
 
-            self.ctx = aggdraw.Draw(self.img)
-        elif tname == 'Line':
-            # coordinates transformation
-            start = obj.csys.apply(obj.start)
-            stop = obj.csys.apply(obj.stop)
+        Returns:
+            np.ndarray[n, 2]: screen coordinates
+        """
+        T = self.transform(csys)
+        x = np.asarray(x, dtype=float).reshape(-1, 2)
+        return np.dot(x, T[:2, :2].T) + T[:2, 2]
 
-            # world coordinates to screen coordinates
-            start = self.world2image(start)[0]
-            stop = self.world2image(stop)[0]
+    def project_element(self, obj, x):
+        """Map world coordinates of an element to screen coordinates
 
-            self.ctx.line((start[0], start[1],
-                           stop[0], stop[1]), obj.style.pen)
+        The result is cached until the element, its coordinate system or the camera changes,
+        so unchanged elements are not projected again.
 
-        else:
-            raise Exception('no renderer registered for element of type \'%s\'' % tname)
+        Args:
+            obj (BaseElement): element the coordinates belong to
+            x (np.ndarray[n, 2]): world coordinates, always the same ones for an element
 
-    # projection methods
+        Returns:
+            np.ndarray[n, 2]: screen coordinates
+        """
+        T = self.transform(obj._active_csys)
+        cached = self.__projections.get(obj)
+        if cached is None or cached[0] != obj._revision or cached[1] is not T:
+            cached = (obj._revision, T, self.project(obj._active_csys, x))
+            self.__projections[obj] = cached
+        return cached[2]
 
     def _p2e(self, X):
         """
@@ -195,6 +510,10 @@ class BaseCamera(object):
     def world2image(self, x):
         pass
 
+    @abstractproperty
+    def matrix(self):
+        pass
+
     @abstractmethod
     def scale(self, x):
         pass
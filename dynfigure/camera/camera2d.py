@@ -10,6 +10,10 @@ class Camera2D(BaseCamera):
                              [0, -1., self.pc[1]],
                              [0, 0, 1.]])
 
+    @property
+    def matrix(self):
+        return self.__T
+
     def scale(self, x):
         return x
 
@@ -0,0 +1,413 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+"""Registry mapping element types to the functions drawing them.
+
+A renderer is called as `renderer(camera, obj)`, a batch renderer as
+`renderer(camera, objs)` with a list of consecutive elements of the same type.
+
+Example:
+
+    @register_renderer(MyElement)
+    def draw_my_element(camera, obj):
+        camera.ctx.line(..., obj.style.pen)
+"""
+
+import numpy as np
+import aggdraw
+from ..style import get_pen, get_brush
+
+from ..elements.circle import Circle
+from ..elements.grid import Grid
+from ..elements.group import Group
+from ..elements.image import Image
+from ..elements.line import Line
+from ..elements.linecollection import LineCollection
+from ..elements.pointcloud import PointCloud
+from ..elements.rectangle import Rectangle
+
+__all__ = ['register_renderer', 'get_renderer', 'register_bounds', 'get_bounds']
+
+_Renderers = {}
+_ResolvedRenderers = {}
+_Bounds = {}
+_ResolvedBounds = {}
+
+# extra pixels around the geometry touched by anti-aliasing
+_AA_MARGIN = 2
+
+
+def register_renderer(element, batch=False):
+    """Register a function drawing elements of the given type
+
+    Renderers apply to subclasses as well, unless those register their own.
+
+    Args:
+        element (type): element class
+        batch (bool, optional): renderer takes a list of elements instead of a single one
+
+    Returns:
+        decorator registering the renderer
+    """
+    # element classes are wrapped by `element_register`
+    element = getattr(element, '__wrapped__', element)
+
+    def wrapper(fn):
+        renderers = _Renderers.setdefault(element, [None, None])
+        renderers[1 if batch else 0] = fn
+        _ResolvedRenderers.clear()
+        return fn
+    return wrapper
+
+
+def get_renderer(element):
+    """Return the renderers for an element type
+
+    The lookup follows the method resolution order and is cached per type.
+
+    Args:
+        element (type): element class
+
+    Returns:
+        tuple: (draw, draw_batch), draw_batch might be None; None if no renderer is registered
+    """
+    try:
+        return _ResolvedRenderers[element]
+    except KeyError:
+        pass
+
+    resolved = None
+    for cls in element.__mro__:
+        if cls in _Renderers:
+            draw, draw_batch = _Renderers[cls]
+            if draw is None:
+                draw = _single(draw_batch)
+            resolved = (draw, draw_batch)
+            break
+
+    _ResolvedRenderers[element] = resolved
+    return resolved
+
+
+def register_bounds(element):
+    """Register a function returning the screen region an element covers
+
+    The function is called as `bounds(camera, obj)` and returns (x0, y0, x1, y1) in
+    screen space or None if the covered region is unknown.
+
+    Args:
+        element (type): element class
+
+    Returns:
+        decorator registering the function
+    """
+    element = getattr(element, '__wrapped__', element)
+
+    def wrapper(fn):
+        _Bounds[element] = fn
+        _ResolvedBounds.clear()
+        return fn
+    return wrapper
+
+
+def get_bounds(element):
+    """Return the bounds function for an element type, None if there is none
+
+    Args:
+        element (type): element class
+    """
+    try:
+        return _ResolvedBounds[element]
+    except KeyError:
+        pass
+
+    resolved = None
+    for cls in element.__mro__:
+        if cls in _Bounds:
+            resolved = _Bounds[cls]
+            break
+
+    _ResolvedBounds[element] = resolved
+    return resolved
+
+
+def _bounds(points, margin=0):
+    x0, y0 = (points.min(axis=0) - margin).tolist()
+    x1, y1 = (points.max(axis=0) + margin).tolist()
+    return (x0, y0, x1, y1)
+
+
+def _margin(style):
+    if style.pen is None:
+        return _AA_MARGIN
+    return style.line_width + _AA_MARGIN
+
+
+def _single(draw_batch):
+    def draw(camera, obj):
+        draw_batch(camera, [obj])
+    return draw
+
+
+def _points(elements, points, lengths):
+    """Return world coordinates (one row per point) and the coordinate system of each row
+
+    Components given in pixels bypass the coordinate system of their element, rows holding
+    such components are transformed here and only need the camera projection, i.e. None.
+
+    Args:
+        elements (list): element of each point
+        points (list): points as given to the elements
+        lengths (list): parsed units of each point, None for plain numbers
+    """
+    systems = [obj._active_csys for obj in elements]
+    if all(length is None for length in lengths):
+        return np.array([point[:2] for point in points], dtype=float), systems
+
+    x = np.empty((len(points), 2))
+    for k, (obj, point, length) in enumerate(zip(elements, points, lengths)):
+        if length is None:
+            x[k] = point[:2]
+        else:
+            x[k] = obj._active_csys.apply(length)[:2]
+            systems[k] = None
+    return x, systems
+
+
+def _project(camera, systems, x):
+    """Project world coordinates (one row per coordinate system) onto the screen
+
+    Rows sharing a coordinate system are projected in a single step.
+    """
+    csys = systems[0]
+    if all(other is csys for other in systems):
+        return camera.project(csys, x)
+
+    groups = {}
+    for k, other in enumerate(systems):
+        groups.setdefault(other, []).append(k)
+
+    projected = np.empty((len(systems), 2))
+    for csys, indices in groups.items():
+        projected[indices] = camera.project(csys, x[indices])
+    return projected
+
+
+def _corners(camera, obj):
+    x, systems = _points([obj, obj], [obj.start, obj.stop], [obj._start_length, obj._stop_length])
+    return _project(camera, systems, x)
+
+
+@register_renderer(Group)
+def draw_group(camera, obj):
+    if obj.static:
+        camera.draw_layer(obj)
+    else:
+        obj.draw(camera)
+
+
+@register_renderer(Circle, batch=True)
+def draw_circles(camera, circles):
+    """Draw several circles using a single projection of all centers and radii
+    """
+    positions, systems = _points(circles, [obj.position for obj in circles],
+                                 [obj._position_length for obj in circles])
+
+    if all(obj._radius_length is None for obj in circles):
+        # plain numbers, measured along x
+        radii = np.array([float(obj._radius) * obj._active_csys.scale[0] for obj in circles])[:, None]
+    else:
+        radii = np.array([_circle_radius(obj) for obj in circles])
+
+    centers = _project(camera, systems, positions)
+    boxes = np.hstack([centers - radii, centers + radii]).tolist()
+
+    for obj, box in zip(circles, boxes):
+        camera.ctx.ellipse(box, obj.style.pen, obj.style.brush)
+
+
+def _circle_radius(obj):
+    # (2,) radii in screen space
+    if obj._radius_length is None:
+        return np.repeat(obj._active_csys.stretch(float(obj._radius)), 2)
+    return obj._active_csys.stretch(obj._radius_length)[:2]
+
+
+@register_bounds(Circle)
+def circle_bounds(camera, obj):
+    positions, systems = _points([obj], [obj.position], [obj._position_length])
+    center = _project(camera, systems, positions)
+    radius = np.abs(_circle_radius(obj))
+    return _bounds(np.vstack([center - radius, center + radius]), _margin(obj.style))
+
+
+def _point_radii(obj):
+    # (N, 1) or (2,) radii in screen space, like scalar radii of circles measured along x
+    if obj._radii is not None:
+        return obj._radii[:, None] * abs(float(obj._active_csys.scale[0]))
+    return np.abs(obj._active_csys.stretch(obj._radius_length)[:2])
+
+
+def _shared(values, count, default, create):
+    """Return one pen or brush per item, created once per distinct row of values
+    """
+    if values is None:
+        return [default] * count
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    shared = [create(tuple(row)) for row in unique.tolist()]
+    return [shared[k] for k in inverse.ravel().tolist()]
+
+
+@register_renderer(PointCloud)
+def draw_point_cloud(camera, obj):
+    count = len(obj.positions)
+    if count == 0:
+        return
+
+    centers = camera.project_element(obj, obj.positions[:, :2])
+    radii = _point_radii(obj)
+    boxes = np.hstack([centers - radii, centers + radii]).tolist()
+
+    style = obj.style
+    pens = _shared(obj.colors, count, style.pen, lambda color: get_pen(color, style.line_width))
+    brushes = _shared(obj.fill_colors, count, style.brush, lambda color: get_brush(color, style.opacity))
+
+    ellipse = camera.ctx.ellipse
+    for box, pen, brush in zip(boxes, pens, brushes):
+        ellipse(box, pen, brush)
+
+
+@register_bounds(PointCloud)
+def point_cloud_bounds(camera, obj):
+    if len(obj.positions) == 0:
+        return (0, 0, 0, 0)
+    centers = camera.project_element(obj, obj.positions[:, :2])
+    radii = _point_radii(obj)
+    # points might have a stroke even if the style has no color
+    margin = obj.style.line_width + _AA_MARGIN
+    return _bounds(np.vstack([centers - radii, centers + radii]), margin)
+
+
+def _segment_pens(obj):
+    style, count = obj.style, len(obj.segments)
+    if obj.colors is None and obj.widths is None:
+        return [style.pen] * count
+    if obj.colors is None and style.color is None:
+        return [None] * count
+
+    colors = obj.colors if obj.colors is not None else np.tile(style.color.rgb, (count, 1))
+    widths = obj.widths if obj.widths is not None else np.full(count, style.line_width)
+    values = np.column_stack([colors, widths])
+    return _shared(values, count, None, lambda row: get_pen(tuple(int(c) for c in row[:4]), row[4]))
+
+
+@register_renderer(LineCollection)
+def draw_line_collection(camera, obj):
+    """Draw all segments using a single projection of their endpoints and shared pens
+    """
+    count = len(obj.segments)
+    if count == 0:
+        return
+
+    lines = camera.project_element(obj, obj.segments.reshape(-1, 2)).reshape(count, 4).tolist()
+    pens = _segment_pens(obj)
+
+    line = camera.ctx.line
+    for coords, pen in zip(lines, pens):
+        if pen is not None:
+            line(coords, pen)
+
+
+@register_bounds(LineCollection)
+def line_collection_bounds(camera, obj):
+    if len(obj.segments) == 0:
+        return (0, 0, 0, 0)
+    points = camera.project_element(obj, obj.segments.reshape(-1, 2))
+    width = obj.widths.max() if obj.widths is not None else obj.style.line_width
+    return _bounds(points, width + _AA_MARGIN)
+
+
+@register_renderer(Line)
+def draw_line(camera, obj):
+    # world coordinates to screen coordinates
+    start, stop = _corners(camera, obj)
+
+    camera.ctx.line((start[0], start[1],
+                     stop[0], stop[1]), obj.style.pen)
+
+
+@register_bounds(Line)
+@register_bounds(Rectangle)
+def corner_bounds(camera, obj):
+    return _bounds(_corners(camera, obj), _margin(obj.style))
+
+
+@register_bounds(Grid)
+def grid_bounds(camera, obj):
+    corners = camera.project(obj._active_csys, [obj.start[:2], obj.stop[:2]])
+    return _bounds(corners, _margin(obj.style))
+
+
+@register_renderer(Rectangle)
+def draw_rectangle(camera, obj):
+    corners = _corners(camera, obj)
+    x0, y0 = corners.min(axis=0).tolist()
+    x1, y1 = corners.max(axis=0).tolist()
+
+    camera.ctx.rectangle((x0, y0, x1, y1), obj.style.pen, obj.style.brush)
+
+
+@register_renderer(Grid)
+def draw_grid(camera, obj):
+    lo = np.minimum(obj.start[:2], obj.stop[:2]).astype(float)
+    hi = np.maximum(obj.start[:2], obj.stop[:2]).astype(float)
+
+    xs = np.arange(lo[0], hi[0] + obj.xstep / 2., obj.xstep)
+    xs = xs[xs <= hi[0]]
+    ys = np.arange(lo[1], hi[1] + obj.ystep / 2., obj.ystep)
+    ys = ys[ys <= hi[1]]
+
+    # endpoints of all vertical and horizontal lines
+    starts = np.concatenate([np.stack([xs, np.full_like(xs, lo[1])], axis=1),
+                             np.stack([np.full_like(ys, lo[0]), ys], axis=1)])
+    stops = np.concatenate([np.stack([xs, np.full_like(xs, hi[1])], axis=1),
+                            np.stack([np.full_like(ys, hi[0]), ys], axis=1)])
+
+    starts = camera.project(obj._active_csys, starts)
+    stops = camera.project(obj._active_csys, stops)
+
+    pen = obj.style.pen
+    for line in np.hstack([starts, stops]).tolist():
+        camera.ctx.line(line, pen)
+
+
+@register_renderer(Image, batch=True)
+def draw_images(camera, images):
+    """Composite images onto the frame in place, touching only their destination rectangles
+    """
+    camera.ctx.flush()
+
+    frame_width, frame_height = camera.img.size
+
+    for obj in images:
+        width, height = obj.img.size
+        x, y = [int(v) for v in obj.top_left.tolist()[:2]]
+
+        # clip destination rectangle to the frame
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, frame_width), min(y + height, frame_height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+
+        camera.composite(obj.img, (x0, y0), (x0 - x, y0 - y, x1 - x, y1 - y))
+
+    # the drawing context keeps its own copy of the frame
+    camera.ctx = aggdraw.Draw(camera.img)
+
+
+@register_bounds(Image)
+def image_bounds(camera, obj):
+    x, y = [int(v) for v in obj.top_left.tolist()[:2]]
+    width, height = obj.img.size
+    return (x, y, x + width, y + height)
@@ -0,0 +1,103 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+from .renderer import get_bounds
+
+__all__ = ['ChangeTracker', 'signatures', 'unchanged']
+
+
+def _signature(obj):
+    style = getattr(obj, 'style', None)
+    csys = getattr(obj, '_active_csys', None)
+    return (getattr(obj, '_revision', None),
+            style.key if style is not None else None,
+            csys.matrix if csys is not None else None)
+
+
+def _unchanged(a, b):
+    # elements without revision count as modified
+    return a[0] is not None and a[0] == b[0] and a[1] == b[1] and a[2] is b[2]
+
+
+def signatures(elements):
+    """Return what the appearance of each element depends on, compare them by `unchanged`
+
+    Args:
+        elements (list): non-group elements
+    """
+    return [_signature(obj) for obj in elements]
+
+
+def unchanged(previous, current):
+    """Whether two lists of signatures describe identically looking elements
+    """
+    return len(previous) == len(current) and all(_unchanged(a, b) for a, b in zip(current, previous))
+
+
+class ChangeTracker(object):
+    """Remembers which elements have been drawn where in the last frame
+    """
+
+    def __init__(self):
+        super(ChangeTracker, self).__init__()
+        self.reset()
+
+    def reset(self):
+        self._state = {}
+        self._order = []
+
+    def bounds(self, obj):
+        """Return the recorded screen region of an element
+        """
+        return self._state[obj.uuid][1]
+
+    def update(self, camera, elements):
+        """Record the elements of the current frame and compare them to the last frame
+
+        Args:
+            camera (BaseCamera): camera projecting the elements
+            elements (list): all non-group elements of the scene in drawing order
+
+        Returns:
+            list of screen regions (x0, y0, x1, y1) which changed since the last frame, None if
+            the extent of a change is unknown
+        """
+        previous, state, dirty = self._state, {}, []
+        unknown = False
+
+        for obj in elements:
+            signature = _signature(obj)
+            recorded = previous.get(obj.uuid)
+
+            if recorded is not None and _unchanged(signature, recorded[0]):
+                state[obj.uuid] = recorded
+                continue
+
+            bounds = get_bounds(type(obj))
+            bounds = bounds(camera, obj) if bounds is not None else None
+            state[obj.uuid] = (signature, bounds)
+
+            # repaint the old and the new region
+            regions = [bounds] if recorded is None else [bounds, recorded[1]]
+            if None in regions:
+                unknown = True
+            else:
+                dirty.extend(regions)
+
+        order = [obj.uuid for obj in elements]
+        for key in self._order:
+            if key not in state:
+                region = previous[key][1]
+                if region is None:
+                    unknown = True
+                else:
+                    dirty.append(region)
+
+        # reordering elements changes their overlap anywhere
+        kept = [key for key in order if key in previous]
+        if kept != [key for key in self._order if key in state]:
+            unknown = True
+
+        self._state, self._order = state, order
+        return None if unknown else dirty
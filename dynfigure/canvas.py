@@ -0,0 +1,61 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+"""Frames sharing their pixel memory with a NumPy array.
+
+The camera renders into such canvases, which allows exporters to hand the pixels
+to an encoder without serializing the frame first.
+"""
+
+import numpy as np
+import PIL.Image
+
+__all__ = ['new_canvas', 'pixels']
+
+
+def new_canvas(width, height, color):
+    """Create an rgba image whose pixels live in a NumPy array
+
+    Args:
+        width (int): width of the image
+        height (int): height of the image
+        color (tuple): rgba color to fill the image with
+
+    Returns:
+        PIL.Image: image with the array attached as `_pixels`
+    """
+    array = np.empty((height, width, 4), dtype=np.uint8)
+    r, g, b, a = tuple(color) + (255,) * (4 - len(color))
+    # one 32 bit store per pixel instead of broadcasting byte by byte
+    array.view('<u4').fill(r | g << 8 | b << 16 | a << 24)
+
+    img = PIL.Image.frombuffer('RGBA', (width, height), array, 'raw', 'RGBA', 0, 1)
+    # drawing, pasting and compositing modify the shared memory in place
+    img.readonly = 0
+    img._pixels = array
+    return img
+
+
+def pixels(frame, channels=4):
+    """Return the raw pixels of a frame, without a copy whenever possible
+
+    Args:
+        frame: PIL.Image or an (height, width, 4) uint8 array
+        channels (int, optional): 4 for rgba or 3 for rgb pixels, dropping alpha
+            always requires a copy
+
+    Returns:
+        buffer holding the pixels row by row
+    """
+    if isinstance(frame, np.ndarray):
+        array = frame
+    else:
+        array = getattr(frame, '_pixels', None)
+        if array is None:
+            mode = 'RGBA' if channels == 4 else 'RGB'
+            if frame.mode != mode:
+                frame = frame.convert(mode)
+            return frame.tobytes()
+
+    return np.ascontiguousarray(array[..., :channels], dtype=np.uint8).data
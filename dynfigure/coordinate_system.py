@@ -5,11 +5,75 @@
 import numpy as np
 import six
 
-__all__ = ['CoordinateSystem', 'get_coordinate_system']
+__all__ = ['CoordinateSystem', 'Length', 'get_coordinate_system']
 
 _CoordinateSystemStack = []
 
 
+class Length(object):
+
+    """Scalar or vector length whose components are given either in world-units or,
+    tagged like '4px', in pixels.
+
+    The tags are parsed once on construction, transforming a length is pure NumPy.
+    Components run along the last axis, so (N, d) values hold N lengths at once.
+
+    Attributes:
+        value (np.ndarray): numeric components
+        absolute (tuple): whether a component is given in pixels, an array for several
+            lengths and None if no component is given in pixels
+        scalar (bool): all components are measured along x
+    """
+    __slots__ = ('value', 'absolute', 'scalar')
+
+    def __init__(self, val, ndim=None):
+        """Parse a length
+
+        Args:
+            val: number, string like '4px' or a (nested) list or array of those
+            ndim (int, optional): expand a scalar length to this many components
+        """
+        super(Length, self).__init__()
+        if isinstance(val, Length):
+            self.value, self.absolute, self.scalar = val.value, val.absolute, val.scalar
+            return
+
+        if _has_units(val):
+            if isinstance(val, np.ndarray):
+                val = val.tolist()
+            absolute = np.array(_map(lambda v: isinstance(v, six.string_types), val), dtype=bool)
+            value = np.array(_map(lambda v: float(v.replace('px', '')) if isinstance(v, six.string_types) else v,
+                                  val), dtype=float)
+        else:
+            absolute, value = None, np.array(val, dtype=float)
+
+        value = np.atleast_1d(value)
+        self.scalar = value.shape == (1,)
+        if self.scalar:
+            # a scalar length is measured along x in every direction
+            value = np.repeat(value, ndim or 1)
+            if absolute is not None:
+                absolute = np.repeat(absolute, ndim or 1)
+
+        self.value = value
+        if absolute is not None and absolute.any():
+            self.absolute = tuple(absolute.tolist()) if absolute.ndim == 1 else absolute
+        else:
+            self.absolute = None
+
+    def __getstate__(self):
+        return self.value, self.absolute, self.scalar
+
+    def __setstate__(self, state):
+        self.value, self.absolute, self.scalar = state
+
+    def __str__(self):
+        absolute = self.absolute if self.absolute is not None else np.zeros(self.value.shape, dtype=bool)
+        return '<DynFigure.Length:({})>'.format(
+            ', '.join('%gpx' % v if a else '%g' % v
+                      for v, a in zip(self.value.ravel(), np.broadcast_to(absolute, self.value.shape).ravel())))
+
+
 class CoordinateSystem(object):
 
     """DynFigure interprets (x, y) as
@@ -22,47 +86,92 @@ class CoordinateSystem(object):
         self.scale = [xscale, yscale, zscale]
         self.shift = [xshift, yshift, zshift]
 
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, val):
+        self._scale = tuple(val)
+        self._scale_array = np.array(self._scale, dtype=float)
+        self._matrix = None
+
+    @property
+    def shift(self):
+        return self._shift
+
+    @shift.setter
+    def shift(self, val):
+        self._shift = tuple(val)
+        self._shift_array = np.array(self._shift, dtype=float)
+        self._matrix = None
+
+    @property
+    def matrix(self):
+        """Return the transformation of (x, y) world-coordinates as homogeneous 3x3 matrix
+
+        The matrix is cached until scale or shift are re-assigned.
+        """
+        if self._matrix is None:
+            sx, sy = self._scale[:2]
+            tx, ty = self._shift[:2]
+            self._matrix = np.array([[sx, 0., sx * tx],
+                                     [0., sy, sy * ty],
+                                     [0., 0., 1.]])
+        return self._matrix
+
+    @staticmethod
+    def _components(values, length, fill):
+        # per component along the last axis, scalar lengths are measured along x and
+        # components beyond z are filled up
+        if length.scalar:
+            return values[0]
+        d = length.value.shape[-1]
+        if d <= 3:
+            return values[:d]
+        return np.concatenate([values, np.full(d - 3, fill)])
+
     def apply(self, val):
         """Apply coordinate transformation in word-space
 
         Args:
-            val: some vector in world-coordinates
+            val: some vector (d,) or vectors (n, d) in world-coordinates, components
+                given in pixels (e.g. '4px') are kept as they are
 
         Returns:
             some transformed vector in world-coordinates
         """
-        if isinstance(val, np.ndarray):
-            val = val.tolist()
-
-        if not isinstance(val, list):
-            val = [val]
-
-        for k in range(len(val)):
-            if isinstance(val[k], six.string_types):
-                val[k] = np.array(float(val[k].replace('px', '')))
-            else:
-                if k < 3:
-                    val[k] = self.scale[k] * (val[k] + self.shift[k])
-
-        return np.array(val)
+        if not isinstance(val, Length):
+            if not _has_units(val):
+                val = np.atleast_1d(np.array(val, dtype=float))
+                d = min(val.shape[-1], 3)
+                val[..., :d] = self._scale_array[:d] * (val[..., :d] + self._shift_array[:d])
+                return val
+            val = Length(val)
+
+        scale = self._components(self._scale_array, val, 1.)
+        applied = scale * (val.value + self._components(self._shift_array, val, 0.))
+        if val.absolute is None:
+            return applied
+        return np.where(val.absolute, val.value, applied)
 
     def stretch(self, val):
-        if isinstance(val, np.ndarray):
-            val = val.tolist()
-
-        if not isinstance(val, list):
-            val = [val]
-
-        for k in range(len(val)):
-            if isinstance(val[k], six.string_types):
-                val[k] = np.array(float(val[k].replace('px', '')))
-            else:
-                if k < 3:
-                    val[k] = self.scale[k] * (val[k] )
+        """Apply coordinate scaling to a length
 
-        return np.array(val)
+        Args:
+            val: some length (d,) or lengths (n, d) in world-coordinates, components
+                given in pixels (e.g. '4px') are kept as they are
 
+        Returns:
+            some scaled length
+        """
+        if not isinstance(val, Length):
+            val = Length(val)
 
+        stretched = self._components(self._scale_array, val, 1.) * val.value
+        if val.absolute is None:
+            return stretched
+        return np.where(val.absolute, val.value, stretched)
 
     def __enter__(self):
         global _CoordinateSystemStack
@@ -74,7 +183,7 @@ class CoordinateSystem(object):
         del _CoordinateSystemStack[-1]
 
     def __str__(self):
-        vals = (self._xscale, self._yscale, self._zscale, self._xshift, self._yshift, self._zshift)
+        vals = tuple(self._scale) + tuple(self._shift)
         return '<DynFigure.CoordinateSystem:(scale: [%.2f, %.2f, %.2f] shift: [%.2f, %.2f, %.2f])>' % (vals)
 
     @staticmethod
@@ -86,9 +195,42 @@ class CoordinateSystem(object):
         return np.array([x, y])
 
 
+def _has_units(val):
+    if isinstance(val, six.string_types):
+        return True
+    if isinstance(val, np.ndarray):
+        if val.dtype.kind in 'SU':
+            return True
+        return val.dtype.kind == 'O' and any(_has_units(v) for v in val.ravel())
+    if isinstance(val, (list, tuple)):
+        return any(_has_units(v) for v in val)
+    return False
+
+
+def _map(fn, val):
+    # apply fn to all entries of nested lists
+    if isinstance(val, (list, tuple)):
+        return [_map(fn, v) for v in val]
+    return fn(val)
+
+
 def get_coordinate_system():
+    """Return the innermost active coordinate system, a new one outside of any context
+    """
     global _CoordinateSystemStack
     if len(_CoordinateSystemStack) > 0:
         return _CoordinateSystemStack[-1]
     else:
         return CoordinateSystem()
+
+
+def _active_coordinate_system():
+    # like get_coordinate_system, but None outside of any context
+    global _CoordinateSystemStack
+    if len(_CoordinateSystemStack) > 0:
+        return _CoordinateSystemStack[-1]
+    return None
+
+
+# draws elements without own coordinate system, never handed out
+_Identity = CoordinateSystem()
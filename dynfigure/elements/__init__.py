@@ -3,4 +3,7 @@ from circle import Circle
 from rectangle import Rectangle
 from group import Group, Scene
 from grid import Grid
-from image import Image
\ No newline at end of file
+from image import Image
+from pointcloud import PointCloud
+from linecollection import LineCollection
+from base import update_elements
\ No newline at end of file
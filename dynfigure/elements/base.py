@@ -5,23 +5,124 @@
 from abc import abstractmethod, ABCMeta
 import six
 from functools import wraps
+from itertools import count
 import copy
-import uuid
+import importlib
+import numpy as np
 
 from ..scope import get_scope
-from ..coordinate_system import get_coordinate_system
+from ..color import Color
+from ..coordinate_system import CoordinateSystem, Length, _has_units, _active_coordinate_system, _Identity
+
+# revision stamps, unique across all elements
+_Revisions = count(1)
+# element ids, cheaper than random uuids
+_Ids = count()
+
+_STYLE_ATTRIBUTES = ('color', 'fill_color', 'line_width', 'opacity')
+
+# element classes hidden behind `element_register`, by module and name
+_Classes = {}
+
+
+def _restore(module, name):
+    """Create an empty element when unpickling, the module registers its classes on import
+    """
+    importlib.import_module(module)
+    cls = _Classes[(module, name)]
+    return cls.__new__(cls)
+
+
+def _slot_names(cls):
+    names = []
+    for base in cls.__mro__:
+        names.extend(name for name in getattr(base, '__slots__', ()) if name != '__weakref__')
+    return names
 
 
 @six.add_metaclass(ABCMeta)
 class BaseElement(object):
     """Represents an object which can be drawn in a scene
 
+    Assigning a public attribute marks the element and all groups containing it
+    as modified, see `touch`. Elements use `__slots__`, subclasses need to declare
+    their attributes.
+
     Attributes:
-        uuid (TYPE): Description
+        uuid (int): unique id of the element within the process
     """
+    __slots__ = ('_csys', 'uuid', '_revision', '_groups', '__weakref__')
+
+    @property
+    def csys(self):
+        """Coordinate system of the element
+
+        Elements created outside of any coordinate system context own one, which is only
+        created once accessed.
+        """
+        if self._csys is None:
+            object.__setattr__(self, '_csys', CoordinateSystem())
+        return self._csys
+
+    @csys.setter
+    def csys(self, val):
+        object.__setattr__(self, '_csys', val)
+
+    @property
+    def _active_csys(self):
+        # coordinate system to draw the element with, without creating one
+        return self._csys if self._csys is not None else _Identity
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith('_'):
+            self.touch()
+
+    def touch(self):
+        """Mark the element as modified
+
+        This happens automatically on attribute assignment, but needs to be called
+        after modifying an attribute in place, e.g. `obj.position[0] = 1`.
+        """
+        object.__setattr__(self, '_revision', next(_Revisions))
+        for group in self._groups:
+            group.touch()
+
+    def __getstate__(self):
+        # slots are restored without touching the element, see `__setstate__`,
+        # the groups containing the element are not part of it
+        return dict((name, getattr(self, name)) for name in _slot_names(type(self))
+                    if name != '_groups' and hasattr(self, name))
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_groups', ())
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        return self._copied(copy.copy(self.__getstate__()))
+
+    def __deepcopy__(self, memo):
+        return self._copied(copy.deepcopy(self.__getstate__(), memo))
+
+    def _copied(self, state):
+        # a copy is a new element, which would otherwise be mistaken for the original in groups
+        cls = type(self)
+        obj = cls.__new__(cls)
+        obj.__setstate__(state)
+        object.__setattr__(obj, 'uuid', next(_Ids))
+        return obj
+
+    def __reduce__(self):
+        # the module attribute of registered classes is the wrapper, not the class
+        cls = type(self)
+        return _restore, (cls.__module__, cls.__name__), self.__getstate__()
+
     def default(self):
-        self.csys = get_coordinate_system()
-        self.uuid = uuid.uuid4().hex
+        object.__setattr__(self, '_revision', 0)
+        object.__setattr__(self, '_groups', ())
+        self.csys = _active_coordinate_system()
+        self.uuid = next(_Ids)
 
     def dtype(self):
         return 'DynFigure.Element'
@@ -36,6 +137,87 @@ class BaseElement(object):
         return self
 
 
+def point_property(name):
+    """Property storing a point as NumPy array and its units parsed once
+
+    The element needs the slots `_<name>` and `_<name>_length`, the latter is None unless
+    a component is given in pixels, e.g. ('10px', 5).
+    """
+    attr, length = '_' + name, '_%s_length' % name
+
+    def getter(self):
+        return getattr(self, attr)
+
+    def setter(self, val):
+        setattr(self, length, Length(val) if _has_units(val) else None)
+        setattr(self, attr, np.array(val))
+
+    return property(getter, setter)
+
+
+def _color(val):
+    if val is None or isinstance(val, (Color, six.string_types)):
+        return Color(val) if val is not None else None
+    return Color(*val)
+
+
+def update_elements(elements, **attributes):
+    """Assign attributes of many elements at once, one value per element
+
+    All elements receive the same revision and every affected group is touched only
+    once. `color`, `fill_color`, `line_width` and `opacity` are assigned to the style.
+    Values are converted like the constructors do, e.g. positions become NumPy arrays.
+
+    Example:
+
+        update_elements(circles, position=X, fill_color=colors[assignments])
+
+    Args:
+        elements (list): elements to modify
+        **attributes: sequences of values with one entry per element
+
+    Raises:
+        ValueError: unknown attribute or not one value per element, nothing is modified then
+    """
+    columns = {}
+    for name, values in attributes.items():
+        for element in elements:
+            if name not in _STYLE_ATTRIBUTES and (name.startswith('_') or not hasattr(type(element), name)):
+                raise ValueError('%s has no attribute %s' % (element, name))
+        # rows of a private copy, later changes to the given array do not leak into elements
+        values = list(np.array(values)) if isinstance(values, np.ndarray) else list(values)
+        if len(values) != len(elements):
+            raise ValueError('%s requires one value per element' % name)
+        columns[name] = values
+
+    try:
+        for name, values in columns.items():
+            if name in ('color', 'fill_color'):
+                for element, value in zip(elements, values):
+                    setattr(element.style, name, _color(value))
+            elif name in _STYLE_ATTRIBUTES:
+                for element, value in zip(elements, values):
+                    setattr(element.style, name, value)
+            else:
+                for element, value in zip(elements, values):
+                    # properties convert their values, plain attributes holding arrays
+                    # are given arrays as well
+                    if isinstance(getattr(element, name, None), np.ndarray):
+                        value = np.array(value)
+                    object.__setattr__(element, name, value)
+    finally:
+        # even partially modified elements need to be drawn again
+        revision = next(_Revisions)
+        groups = {}
+        for element in elements:
+            object.__setattr__(element, '_revision', revision)
+            for group in element._groups:
+                groups[id(group)] = group
+
+        for group in groups.values():
+            group.touch()
+
+
 def element_register():
     """Allow usage of scopes to apply the same kargs to all elements within
        a scope
@@ -51,5 +233,8 @@ def element_register():
             outputs = cls(*args, **actual_args)
             return outputs
 
+        # keep a reference to the actual class, e.g. to dispatch on its type
+        wrapped_class.__wrapped__ = cls
+        _Classes[(cls.__module__, cls.__name__)] = cls
         return wrapped_class
     return wrapper
@@ -2,13 +2,18 @@
 # -*- coding: utf-8 -*-
 # Author: Patrick Wieschollek <mail@patwie.com>
 
-from .base import element_register, BaseElement
+from .base import element_register, BaseElement, point_property
 from ..style import Style
-import numpy as np
+from ..coordinate_system import Length
+import numbers
 
 
 @element_register()
 class Circle(BaseElement):
+    __slots__ = ('style', '_position', '_position_length', '_radius', '_radius_length')
+
+    position = point_property('position')
+
     def __init__(self, position, radius, style=Style()):
         """Summary
 
@@ -19,8 +24,18 @@ class Circle(BaseElement):
         """
         self.default()
         self.style = style.clone()
-        self.position = np.array(position)
+        self.position = position
         self.radius = radius
 
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, val):
+        self._radius = val
+        # parse units once instead of every frame, plain numbers need no parsing
+        self._radius_length = None if isinstance(val, numbers.Number) else Length(val, ndim=2)
+
     def __str__(self):
         return '<DynFigure.Circle:({}:{})>'.format(self.position, self.radius)
@@ -9,6 +9,8 @@ import numpy as np
 
 @element_register()
 class Grid(BaseElement):
+    __slots__ = ('style', 'start', 'stop', 'step')
+
     def __init__(self, start, stop, xstep=1, ystep=1, style=Style()):
         self.default()
         self.style = style.clone()
@@ -24,4 +26,4 @@ class Grid(BaseElement):
 
     @property
     def ystep(self):
-        return self.step[0]
+        return self.step[1]
@@ -6,41 +6,105 @@ from ..color import Color
 from .base import BaseElement, element_register
 from ..frame import Frame
 from ..exporter import get_exporter_context
+from collections import OrderedDict
 import copy
 
 
 @element_register()
 class Group(BaseElement):
 
-    """docstring for Group"""
-    def __init__(self):
+    """Ordered collection of elements
+
+    Elements are indexed by their id, so finding and removing them takes constant time.
+
+    A static group is rasterized once by the camera and re-used as a cached layer
+    until something inside the group is modified.
+    """
+    __slots__ = ('_elements', '_element_list', 'static')
+
+    def __init__(self, static=False):
+        """
+        Args:
+            static (bool, optional): cache the rasterized group between frames
+        """
         self.default()
-        self.elements = []
+        self._elements = OrderedDict()
+        self._element_list = ()
+        self.static = static
+
+    @property
+    def elements(self):
+        """Return the elements in drawing order
+
+        The tuple cannot be modified, use `put` and `remove` or assign a new sequence,
+        e.g. `group.elements = reversed(group.elements)`.
+        """
+        if self._element_list is None:
+            self._element_list = tuple(self._elements.values())
+        return self._element_list
+
+    @elements.setter
+    def elements(self, elements):
+        elements = list(elements)
+        self.remove(list(self._elements.values()))
+        self.put(elements)
 
     def put(self, elements):
         """Put drawable element into the scene
 
+        Elements which are already part of the group keep their position.
+
         Args:
-            elements (Element): element to draw
+            elements (Element): element or list of elements to draw
+
+        Raises:
+            ValueError: another element with the same id is part of the group
         """
 
-        if not isinstance(elements, list):
+        if not isinstance(elements, (list, tuple)):
             elements = [elements]
 
         for element in elements:
             assert element.dtype() == 'DynFigure.Element', 'Group.put requires and element'
-            self.elements.append(element)
-
-    def remove(self, element):
+            present = self._elements.get(element.uuid)
+            if present is element:
+                continue
+            if present is not None:
+                raise ValueError('another element with id %i is already part of the group' % element.uuid)
+            self._elements[element.uuid] = element
+            element._groups = element._groups + (self,)
+
+        self._element_list = None
+        self.touch()
+
+    def remove(self, elements):
         """Remove drawable element from the scene
 
         Args:
-            element (Element): element to remove
+            elements (Element): element or list of elements to remove
         """
-        for k, el in enumerate(self.elements):
-            if el.uuid == element.uuid:
-                del self.elements[k]
-                break
+        if not isinstance(elements, (list, tuple)):
+            elements = [elements]
+
+        removed = False
+        for element in elements:
+            el = self._elements.pop(element.uuid, None)
+            if el is not None:
+                el._groups = tuple(group for group in el._groups if group is not self)
+                removed = True
+
+        if removed:
+            self._element_list = None
+            self.touch()
+
+    def __setstate__(self, state):
+        BaseElement.__setstate__(self, state)
+        # copied elements have new ids, and elements do not store their groups,
+        # index and link them again
+        self._elements = OrderedDict((element.uuid, element) for element in self._elements.values())
+        self._element_list = None
+        for element in self._elements.values():
+            element._groups = element._groups + (self,)
 
     def find(self, element):
         """Return a reference to a drawable element from the scene
@@ -48,15 +112,24 @@ class Group(BaseElement):
         Args:
             element (Element): element to find
         """
-        for k, el in enumerate(self.elements):
-            if el.uuid == element.uuid:
-                return self.elements[k]
+        return self._elements.get(element.uuid)
 
-    def draw(self, camera, verbose=False):
+    def leaves(self):
+        """Return all non-group elements of this group and its sub-groups in drawing order
+        """
+        leaves = []
         for element in self.elements:
-            if verbose:
+            if isinstance(element, Group.__wrapped__):
+                leaves.extend(element.leaves())
+            else:
+                leaves.append(element)
+        return leaves
+
+    def draw(self, camera, verbose=False):
+        if verbose:
+            for element in self.elements:
                 print('draw %s' % element)
-            element.draw(camera)
+        camera.draw_elements(self.elements)
         camera.flush()
 
     def __str__(self):
@@ -11,6 +11,8 @@ import six
 
 @element_register()
 class Image(BaseElement):
+    __slots__ = ('style', 'top_left', 'img', 'scaling')
+
     def __init__(self, src, top_left=[0, 0], style=Style(), scaling=1.):
         """Summary
 
@@ -2,20 +2,24 @@
 # -*- coding: utf-8 -*-
 # Author: Patrick Wieschollek <mail@patwie.com>
 
-from .base import element_register, BaseElement
+from .base import element_register, BaseElement, point_property
 from ..style import Style
-import numpy as np
 
 
 @element_register()
 class Line(BaseElement):
+    __slots__ = ('style', '_start', '_start_length', '_stop', '_stop_length')
+
+    start = point_property('start')
+    stop = point_property('stop')
+
     def __init__(self, start, stop, style=Style()):
         self.default()
 
         self.style = style.clone()
 
-        self.start = np.array(start)
-        self.stop = np.array(stop)
+        self.start = start
+        self.stop = stop
 
     def __str__(self):
         return '<DynFigure.Line:({}-{})>'.format(self.start, self.stop)
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+from .base import element_register, BaseElement
+from .pointcloud import _colors
+from ..style import Style
+import numpy as np
+
+
+@element_register()
+class LineCollection(BaseElement):
+    """Many line segments stored as arrays instead of one element per segment
+
+    Animating the segments only requires assigning a new array, e.g. `lines.segments = S`.
+    Arrays modified in place require a call to `touch`.
+    """
+    __slots__ = ('style', '_segments', '_colors', '_widths')
+
+    def __init__(self, segments, colors=None, widths=None, style=Style()):
+        """
+        Args:
+            segments: (N, 2, 2) world coordinates of start and stop of each segment
+            colors (optional): (N, 3) or (N, 4) colors or a list of Colors, defaults to
+                the color of the style
+            widths (optional): (N,) line widths, defaults to the line width of the style
+            style: draw style
+        """
+        self.default()
+        self.style = style.clone()
+        self.segments = segments
+        self.colors = colors
+        self.widths = widths
+
+    @property
+    def segments(self):
+        return self._segments
+
+    @segments.setter
+    def segments(self, val):
+        # a private copy, in-place updates must not write into the caller's array
+        self._segments = np.array(val, dtype=float).reshape(-1, 2, 2)
+
+    @property
+    def colors(self):
+        return self._colors
+
+    @colors.setter
+    def colors(self, val):
+        self._colors = _colors(val)
+
+    @property
+    def widths(self):
+        return self._widths
+
+    @widths.setter
+    def widths(self, val):
+        self._widths = np.array(val, dtype=float) if val is not None else None
+
+    def update(self, segments=None, colors=None, widths=None, indices=None):
+        """Replace the arrays of all segments or modify a subset of them in place
+
+        The collection is marked as modified once, no matter how many segments changed.
+
+        Args:
+            segments (optional): new world coordinates of start and stop
+            colors (optional): new colors
+            widths (optional): new line widths
+            indices (optional): index or mask of the segments to modify, all by default
+        """
+        if indices is None:
+            if segments is not None:
+                self._segments = np.array(segments, dtype=float).reshape(-1, 2, 2)
+            if colors is not None:
+                self._colors = _colors(colors)
+            if widths is not None:
+                self._widths = np.array(widths, dtype=float)
+        else:
+            if segments is not None:
+                self._segments[indices] = segments
+            for name, val in (('_colors', colors), ('_widths', widths)):
+                if val is None:
+                    continue
+                if getattr(self, name) is None:
+                    raise ValueError('%s are shared by all segments and cannot be updated per segment'
+                                     % name[1:])
+                getattr(self, name)[indices] = _colors(val) if name == '_colors' else val
+
+        self.touch()
+
+    def __str__(self):
+        return '<DynFigure.LineCollection:(%i)>' % len(self._segments)
@@ -0,0 +1,134 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+from .base import element_register, BaseElement
+from ..style import Style
+from ..color import Color
+from ..coordinate_system import Length
+import numpy as np
+
+
+def _colors(val):
+    """Convert colors to a private (N, 4) integer array, None is kept
+    """
+    if val is None:
+        return None
+    if len(val) > 0 and isinstance(val[0], Color):
+        val = [color.rgb for color in val]
+    val = np.array(val, dtype=int)
+    if val.shape[-1] == 3:
+        val = np.concatenate([val, np.full(val.shape[:-1] + (1,), 255, dtype=int)], axis=-1)
+    return val
+
+
+@element_register()
+class PointCloud(BaseElement):
+    """Many circular markers stored as arrays instead of one element per point
+
+    Animating the points only requires assigning new arrays, e.g. `cloud.positions = X`.
+    Arrays modified in place require a call to `touch`.
+    """
+    __slots__ = ('style', '_positions', '_radius', '_radius_length', '_radii', '_colors', '_fill_colors')
+
+    def __init__(self, positions, radius=1, colors=None, fill_colors=None, style=Style()):
+        """
+        Args:
+            positions: (N, 2) world coordinates of the points
+            radius: radius shared by all points, which might have units like '4px',
+                or an (N,) NumPy array of radii in world coordinates
+            colors (optional): (N, 3) or (N, 4) stroke colors or a list of Colors,
+                defaults to the color of the style
+            fill_colors (optional): fill colors like `colors`, defaults to the fill color
+                of the style
+            style: draw style, its line width and opacity apply to all points
+        """
+        self.default()
+        self.style = style.clone()
+        self.positions = positions
+        self.radius = radius
+        self.colors = colors
+        self.fill_colors = fill_colors
+
+    @property
+    def positions(self):
+        return self._positions
+
+    @positions.setter
+    def positions(self, val):
+        # a private copy, in-place updates must not write into the caller's array
+        self._positions = np.array(val, dtype=float)
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, val):
+        if isinstance(val, np.ndarray) and val.ndim == 1:
+            val = np.array(val, dtype=float)
+            self._radius_length = None
+            self._radii = val
+        else:
+            # parse units once instead of every frame
+            self._radius_length = Length(val, ndim=2)
+            self._radii = None
+        self._radius = val
+
+    @property
+    def colors(self):
+        return self._colors
+
+    @colors.setter
+    def colors(self, val):
+        self._colors = _colors(val)
+
+    @property
+    def fill_colors(self):
+        return self._fill_colors
+
+    @fill_colors.setter
+    def fill_colors(self, val):
+        self._fill_colors = _colors(val)
+
+    def update(self, positions=None, colors=None, fill_colors=None, radius=None, indices=None):
+        """Replace the arrays of all points or modify a subset of them in place
+
+        The point cloud is marked as modified once, no matter how many points changed.
+
+        Args:
+            positions (optional): new world coordinates
+            colors (optional): new stroke colors
+            fill_colors (optional): new fill colors
+            radius (optional): new radius, an array when given `indices`
+            indices (optional): index or mask of the points to modify, all points by default
+
+        Example:
+
+            cloud.update(positions=X_new)
+            cloud.update(fill_colors=[[255, 0, 0]], indices=[42])
+        """
+        if indices is None:
+            if positions is not None:
+                self._positions = np.array(positions, dtype=float)
+            if colors is not None:
+                self._colors = _colors(colors)
+            if fill_colors is not None:
+                self._fill_colors = _colors(fill_colors)
+            if radius is not None:
+                object.__setattr__(self, 'radius', radius)
+        else:
+            if positions is not None:
+                self._positions[indices] = positions
+            for name, val in (('_colors', colors), ('_fill_colors', fill_colors), ('_radii', radius)):
+                if val is None:
+                    continue
+                if getattr(self, name) is None:
+                    raise ValueError('%s are shared by all points and cannot be updated per point'
+                                     % name[1:].replace('_', ' '))
+                getattr(self, name)[indices] = _colors(val) if name != '_radii' else val
+
+        self.touch()
+
+    def __str__(self):
+        return '<DynFigure.PointCloud:(%i)>' % len(self._positions)
@@ -1,3 +1,5 @@
-from mp4 import Mp4
+from mp4 import Mp4, SegmentedMp4, PROFILES
 from gif import Gif
-from base import get_exporter_context
\ No newline at end of file
+from npy import Npy
+from tee import Tee
+from base import get_exporter_context
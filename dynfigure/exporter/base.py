@@ -4,7 +4,13 @@
 
 
 from abc import abstractmethod, ABCMeta
+from six.moves import queue
+import threading
+import zlib
+import sys
 import six
+from ..canvas import pixels
+from ..stats import timer
 
 __all__ = ['get_exporter_context', 'Base']
 _ExportSystemStack = []
@@ -19,17 +25,49 @@ def get_exporter_context():
         # raise Exception('no exporter in current context')
 
 
+def _fingerprint(frame):
+    """Cheap content hash to detect repeated frames
+    """
+    data = pixels(frame)
+    shape = frame.shape if hasattr(frame, 'shape') else frame.size
+    return (tuple(shape), zlib.crc32(data), zlib.adler32(data))
+
+
 @six.add_metaclass(ABCMeta)
 class Base(object):
     """docstring for Base"""
 
-    def __init__(self, fn, fps=30, height=1080, width=1920, skip=False):
+    def __init__(self, fn, fps=30, height=1080, width=1920, skip=False, queue_size=0, dedup=False,
+                 stats=None):
+        """
+        Args:
+            fn (str): output file
+            fps (int, optional): frames per second
+            height (int, optional): frame height
+            width (int, optional): frame width
+            skip (bool, optional): unused
+            queue_size (int, optional): if positive, frames are queued and encoded by a
+                background thread, at most `queue_size` frames are waiting. Queued frames
+                must not be modified, e.g. by a camera re-using its frame buffers.
+            dedup (bool, optional): merge identical consecutive frames into a single frame
+                shown for their total length. The latest frame is held back until a different
+                one arrives, it must not be modified meanwhile.
+            stats (Stats, optional): collect timings of serializing and writing frames,
+                a summary is printed when leaving the context
+        """
         super(Base, self).__init__()
         self._fn = fn
         self._fps = fps
         self._height = height
         self._width = width
         self.skip = skip
+        self._queue_size = queue_size
+        self._queue = None
+        self._writer = None
+        self._writer_error = None
+        self._dedup = dedup
+        self._pending = None
+        self.stats = stats
 
     @property
     def fps(self):
@@ -43,14 +81,77 @@ class Base(object):
     def width(self):
         return self._width
 
-    @abstractmethod
     def add_frame(self, frame, length=1):
+        """Add a frame to the output
+
+        Args:
+            frame (PIL.Image): frame, None is ignored
+            length (int, optional): number of times the frame is shown
+        """
+        if frame is None:
+            return
+
+        if not self._dedup:
+            self._put_frame(frame, length)
+            return
+
+        key = _fingerprint(frame)
+        if self._pending is not None and self._pending[1] == key:
+            # hold the newest frame, older ones might be re-used by the camera
+            self._pending = (frame, key, self._pending[2] + length)
+            return
+
+        self._flush_pending()
+        self._pending = (frame, key, length)
+
+    def _flush_pending(self):
+        if self._pending is not None:
+            frame, _, length = self._pending
+            self._pending = None
+            self._put_frame(frame, length)
+
+    def _put_frame(self, frame, length):
+        if self._queue is None:
+            self._add_frame(frame, length)
+        else:
+            self._raise_writer_error()
+            # blocks while the writer is behind
+            with timer(self.stats, 'queue wait'):
+                self._queue.put((frame, length))
+
+    @abstractmethod
+    def _add_frame(self, frame, length):
         pass
 
+    def _write_frames(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            # keep draining the queue after an error so add_frame does not block
+            if self._writer_error is None:
+                try:
+                    self._add_frame(*item)
+                except Exception:
+                    self._writer_error = sys.exc_info()
+
+    def _raise_writer_error(self):
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            six.reraise(*error)
+
     def __enter__(self):
         global _ExportSystemStack
         _ExportSystemStack.append(self)
-        return self._enter()
+        output = self._enter()
+
+        if self._queue_size > 0:
+            self._queue = queue.Queue(self._queue_size)
+            self._writer = threading.Thread(target=self._write_frames)
+            self._writer.daemon = True
+            self._writer.start()
+
+        return output
 
     @abstractmethod
     def _enter(self):
@@ -59,8 +160,24 @@ class Base(object):
     def __exit__(self, exc_type, exc_val, exc_tb):
         global _ExportSystemStack
         del _ExportSystemStack[-1]
-        self._exit(exc_type, exc_val, exc_tb)
+
+        try:
+            self._flush_pending()
+        finally:
+            if self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+                self._queue, self._writer = None, None
+
+            self._exit(exc_type, exc_val, exc_tb)
+
+        # do not mask an exception raised within the context
+        if exc_type is None:
+            self._raise_writer_error()
+
+        if self.stats is not None:
+            print(self.stats.summary())
 
     @abstractmethod
     def _exit(self):
-        pass
\ No newline at end of file
+        pass
@@ -2,59 +2,65 @@
 # -*- coding: utf-8 -*-
 # Author: Patrick Wieschollek <mail@patwie.com>
 
-import subprocess as sp
+import struct
+from PIL import GifImagePlugin
 from .base import Base
-import uuid
-import os
-import shutil
+from ..stats import timer
 
+# PIL.Image.FASTOCTREE
+_FASTOCTREE = 2
 
-class Gif(Base):
 
-    def __init__(self, fn, fps=30, height=1080, width=1920):
-        super(Base, self).__init__()
-        self._fn = fn
-        self._fps = fps
-        self._height = height
-        self._width = width
-        self.uuid = uuid.uuid4().hex
+class Gif(Base):
+    """Animated GIF, frames are quantized and encoded as soon as they are added
+    """
 
-    def add_frame(self, frame, length=1):
+    def __init__(self, fn, fps=30, height=1080, width=1920, colors=256, queue_size=0, dedup=False,
+                 stats=None):
+        """
+        Args:
+            fn (str): output file
+            fps (int, optional): frames per second
+            height (int, optional): frame height
+            width (int, optional): frame width
+            colors (int, optional): maximum number of colors per frame
+            queue_size (int, optional): encode frames in a background thread, see `Base`
+            dedup (bool, optional): turn repeated frames into a longer delay, see `Base`
+            stats (Stats, optional): collect timings, see `Base`
+        """
+        super(Gif, self).__init__(fn, fps=fps, height=height, width=width,
+                                  queue_size=queue_size, dedup=dedup, stats=stats)
+        self._colors = colors
 
-        if frame is not None:
+    def _add_frame(self, frame, length):
+        assert self._height == frame.height
+        assert self._width == frame.width
 
-            assert self._height == frame.height
-            assert self._width == frame.width
+        # GIF delays are given in 1/100 s, carry rounding errors over to the next frame
+        start = int(round(self._time))
+        self._time += 100. * length / self._fps
+        delay = int(round(self._time)) - start
 
-            for l in range(length):
-                frame_fn = os.path.join(self.tmp_dir, 'frame%010i.png' % self.counter)
-                self.counter += 1
-                self.frame_png_names.append(frame_fn)
-                frame.save(frame_fn)
+        with timer(self.stats, 'serialize'):
+            frame = frame.convert('RGB').quantize(colors=self._colors, method=_FASTOCTREE)
+            chunks = GifImagePlugin.getdata(frame, duration=10 * delay, include_color_table=True)
+        with timer(self.stats, 'encoder write'):
+            for chunk in chunks:
+                self._fp.write(chunk)
 
     def _enter(self):
         print('writing to %s' % self._fn)
 
-        self.tmp_dir = os.path.join('/tmp', self.uuid)
-        self.frame_png_names = []
-        self.counter = 0
-        os.mkdir(self.tmp_dir)
+        self._time = 0.
+        self._fp = open(self._fn, 'wb')
+
+        # header and logical screen without global color table
+        self._fp.write(b'GIF89a' + struct.pack('<HHBBB', self._width, self._height, 0, 0, 0))
+        # loop forever
+        self._fp.write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', 0) + b'\x00')
 
         return self
 
     def _exit(self, exc_type, exc_val, exc_tb):
-
-        command = [
-            'convert',
-            '-delay',
-            str(100. / self._fps),
-            '-loop',
-            '0',
-            os.path.join(self.tmp_dir, '*.png'),
-            self._fn
-        ]
-        pipe = sp.Popen(command, stdin=sp.PIPE)
-        pipe.stdin.close()
-        pipe.wait()
-
-        shutil.rmtree(self.tmp_dir)
+        self._fp.write(b';')
+        self._fp.close()
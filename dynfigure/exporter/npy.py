@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+import numpy as np
+from .base import Base
+from ..canvas import pixels
+from ..stats import timer
+
+__all__ = ['Npy']
+
+# fixed header size, the frame count is patched in place when closing the file
+_HEADER_SIZE = 128
+
+
+def _header(count, height, width, channels):
+    header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%d, %d, %d, %d), }" % (
+        count, height, width, channels)
+    magic = np.lib.format.magic(1, 0)
+    padding = _HEADER_SIZE - len(magic) - 2 - len(header) - 1
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    return magic + np.array([len(header)], dtype='<u2').tobytes() + header
+
+
+class Npy(Base):
+    """Raw frames stored as an uncompressed (T, H, W, C) uint8 array in NumPy's .npy format
+
+    The file can be opened memory-mapped, which gives random access to every frame
+    without decoding.
+
+    Example:
+
+        with exporter.Npy('clock.npy', height=SIZE, width=SIZE) as store:
+            store.add_frame(cam.render(scene))
+
+        frames = exporter.Npy.open('clock.npy')
+        frame = frames[42]
+    """
+
+    def __init__(self, fn, fps=30, height=1080, width=1920, channels=4, queue_size=0, dedup=False,
+                 stats=None):
+        """
+        Args:
+            fn (str): output file
+            fps (int, optional): frames per second, not stored
+            height (int, optional): frame height
+            width (int, optional): frame width
+            channels (int, optional): 4 for rgba or 3 for rgb frames
+            queue_size (int, optional): write frames in a background thread, see `Base`
+            dedup (bool, optional): serialize repeated frames only once, see `Base`
+            stats (Stats, optional): collect timings, see `Base`
+        """
+        super(Npy, self).__init__(fn, fps=fps, height=height, width=width,
+                                  queue_size=queue_size, dedup=dedup, stats=stats)
+        if channels not in (3, 4):
+            raise ValueError('frames are stored with 3 or 4 channels')
+        self._channels = channels
+
+    @staticmethod
+    def open(fn):
+        """Return all frames of a file as read-only memory-mapped array
+        """
+        return np.load(fn, mmap_mode='r')
+
+    def _add_frame(self, frame, length):
+        size = frame.shape[1::-1] if isinstance(frame, np.ndarray) else frame.size
+        assert tuple(size) == (self._width, self._height)
+
+        with timer(self.stats, 'serialize'):
+            data = pixels(frame, self._channels)
+        with timer(self.stats, 'encoder write', length):
+            for _ in range(length):
+                self._fp.write(data)
+        self._count += length
+
+    def _enter(self):
+        print('writing to %s' % self._fn)
+
+        self._count = 0
+        self._fp = open(self._fn, 'wb')
+        self._fp.write(_header(0, self._height, self._width, self._channels))
+        return self
+
+    def _exit(self, exc_type, exc_val, exc_tb):
+        self._fp.seek(0)
+        self._fp.write(_header(self._count, self._height, self._width, self._channels))
+        self._fp.close()
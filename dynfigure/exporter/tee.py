@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+import numpy as np
+import PIL.Image
+from . import base
+from ..stats import timer
+
+__all__ = ['Tee']
+
+
+class Tee(base.Base):
+    """Forward every frame to several exporters
+
+    Frames are resized to the dimension of each exporter if it differs. Frames are added
+    at the frame rate of the first exporter, exporters with a different frame rate show
+    each frame proportionally longer or shorter, skipping frames if necessary, so all
+    outputs play at the same speed.
+
+    Example:
+
+        with exporter.Tee(exporter.Mp4('kmeans.mp4', height=500, width=500),
+                          exporter.Gif('kmeans.gif', height=500, width=500),
+                          exporter.Gif('thumbnail.gif', height=100, width=100)) as video:
+            for scene in algorithm(X, C):
+                video.add_frame(cam.render(scene))
+    """
+
+    def __init__(self, *exporters, **kwargs):
+        """
+        Args:
+            *exporters (Base): receivers of all frames
+            **kwargs: `queue_size`, `dedup` and `stats`, see `Base`
+        """
+        if len(exporters) == 0:
+            raise ValueError('Tee requires at least one exporter')
+        first = exporters[0]
+        super(Tee, self).__init__(None, fps=first.fps, height=first.height, width=first.width, **kwargs)
+        self._exporters = exporters
+
+    def _add_frame(self, frame, length):
+        start, self._shown = self._shown, self._shown + length
+
+        # resize only once per distinct dimension
+        frames = {}
+        for exporter in self._exporters:
+            # frames up to the end of this frame on the timeline of the exporter
+            exporter_length = (self._frames(self._shown, exporter.fps) -
+                               self._frames(start, exporter.fps))
+            if exporter_length == 0:
+                continue
+            size = (exporter.width, exporter.height)
+            if size not in frames:
+                frames[size] = self._resize(frame, size)
+            exporter.add_frame(frames[size], exporter_length)
+
+    def _frames(self, shown, fps):
+        return int(shown * fps // self.fps)
+
+    def _resize(self, frame, size):
+        if isinstance(frame, np.ndarray):
+            if frame.shape[1::-1] == size:
+                return frame
+            frame = PIL.Image.fromarray(frame)
+        if frame.size == size:
+            return frame
+        with timer(self.stats, 'resize'):
+            return frame.resize(size, PIL.Image.LANCZOS)
+
+    def _enter(self):
+        # frames added so far at the frame rate of the Tee
+        self._shown = 0
+
+        entered = []
+        try:
+            for exporter in self._exporters:
+                exporter.__enter__()
+                entered.append(exporter)
+        except Exception:
+            for exporter in reversed(entered):
+                exporter.__exit__(None, None, None)
+            raise
+
+        # the children pushed themselves onto the context stack, the Tee belongs on top
+        base._ExportSystemStack.remove(self)
+        base._ExportSystemStack.append(self)
+        return self
+
+    def _exit(self, exc_type, exc_val, exc_tb):
+        error = None
+        for exporter in reversed(self._exporters):
+            try:
+                exporter.__exit__(exc_type, exc_val, exc_tb)
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+"""Render frames in a pool of processes and write them in order to an exporter.
+
+Example:
+
+    def clock(i):
+        hand_sec.stop = ...
+        return scene
+
+    with exporter.Mp4('clock.mp4', height=SIZE, width=SIZE) as vid:
+        pipeline.render_parallel(cam, vid, clock, count=60, length=vid.fps)
+"""
+
+from collections import deque
+import multiprocessing
+import pickle
+
+__all__ = ['render_parallel']
+
+# camera of the worker process
+_camera = None
+
+
+def _init_worker(camera):
+    global _camera
+    _camera = camera
+
+
+def _render_scene(data):
+    return _camera.render(pickle.loads(data))
+
+
+def _render_index(task):
+    producer, index = task
+    return _camera.render(producer(index))
+
+
+def render_parallel(camera, exporter, frames, count=None, processes=None, buffer_size=None, length=1):
+    """Render frames in worker processes and add them to an exporter in their original order
+
+    Args:
+        camera (BaseCamera): camera used to render, every worker receives a copy
+        exporter (Base): sink receiving the rendered frames
+        frames: either a picklable callable returning the scene of frame `i`, depending on
+            nothing but `i`, or an iterable of scenes. The callable is preferred as scenes are
+            then built in the workers, too.
+        count (int, optional): number of frames, required when `frames` is a callable
+        processes (int, optional): number of worker processes, defaults to the number of cores
+        buffer_size (int, optional): maximum number of frames in flight, defaults to
+            twice the number of processes
+        length (int, optional): number of times each frame is repeated in the exporter
+
+    Returns:
+        int: number of rendered frames
+    """
+    if callable(frames):
+        if count is None:
+            raise ValueError('rendering from a callable requires the number of frames')
+        tasks = ((frames, index) for index in range(count))
+        render = _render_index
+    else:
+        # serialize right away, generators often yield the same scene modified in place
+        tasks = (pickle.dumps(scene, pickle.HIGHEST_PROTOCOL) for scene in frames)
+        render = _render_scene
+
+    processes = processes or multiprocessing.cpu_count()
+    buffer_size = buffer_size or 2 * processes
+
+    pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(camera,))
+    rendered = 0
+    try:
+        # results in submission order, the head blocks until its frame is done
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= buffer_size:
+                exporter.add_frame(pending.popleft().get(), length)
+                rendered += 1
+            pending.append(pool.apply_async(render, (task,)))
+
+        while len(pending) > 0:
+            exporter.add_frame(pending.popleft().get(), length)
+            rendered += 1
+
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+    return rendered
@@ -0,0 +1,100 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Patrick Wieschollek <mail@patwie.com>
+
+"""Counters and cumulative timers for the stages of rendering and exporting a video.
+
+Example:
+
+    stats = Stats()
+    cam = camera.Camera2D(width=SIZE, height=SIZE, stats=stats)
+
+    with exporter.Mp4('clock.mp4', height=SIZE, width=SIZE, stats=stats) as vid:
+        for i in range(60):
+            with stats.timer('scene build'):
+                hand_sec.stop = ...
+            vid.add_frame(cam.render(scene))
+
+    # the summary is printed when leaving the exporter context
+
+Cameras rendering in worker processes keep their own copy of the stats.
+"""
+
+from contextlib import contextmanager
+from timeit import default_timer
+
+__all__ = ['Stats', 'timer']
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stats, name, count=1):
+    """Return a context measuring a stage, which does nothing if `stats` is None
+
+    Args:
+        stats (Stats): collected statistics or None
+        name (str): name of the stage
+        count (int, optional): number of items processed in the stage
+    """
+    if stats is None:
+        return _NULL_TIMER
+    return stats.timer(name, count)
+
+
+class Stats(object):
+    """Number of calls and cumulative time per named stage
+    """
+
+    def __init__(self):
+        super(Stats, self).__init__()
+        self.reset()
+
+    def reset(self):
+        self.counts = {}
+        self.times = {}
+
+    def add(self, name, seconds, count=1):
+        """Record time spent in a stage
+
+        Args:
+            name (str): name of the stage
+            seconds (float): elapsed time
+            count (int, optional): number of items processed
+        """
+        self.counts[name] = self.counts.get(name, 0) + count
+        self.times[name] = self.times.get(name, 0.) + seconds
+
+    @contextmanager
+    def timer(self, name, count=1):
+        """Measure the time spent within the context
+
+        Args:
+            name (str): name of the stage
+            count (int, optional): number of items processed
+        """
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.add(name, default_timer() - start, count)
+
+    def summary(self):
+        """Return a table of all stages, slowest first
+        """
+        lines = ['%-24s %10s %10s %10s' % ('stage', 'count', 'total [s]', 'each [ms]')]
+        for name in sorted(self.times, key=lambda name: -self.times[name]):
+            count, seconds = self.counts[name], self.times[name]
+            lines.append('%-24s %10d %10.3f %10.3f' % (name, count, seconds, 1000. * seconds / max(count, 1)))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.summary()
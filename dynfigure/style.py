@@ -3,12 +3,69 @@
 # Author: Patrick Wieschollek <mail@patwie.com>
 
 from .color import Color
+from itertools import count
 import aggdraw
-import copy
+
+# native pens and brushes shared by all styles with identical values
+_PenCache = {}
+_BrushCache = {}
+_MAX_CACHE_SIZE = 4096
+
+_Revisions = count(1)
+
+
+def get_pen(color, line_width=1):
+    """Return a shared aggdraw pen
+
+    Args:
+        color (tuple): rgba color
+        line_width (float, optional): width of the pen
+    """
+    key = (tuple(color), line_width)
+    try:
+        return _PenCache[key]
+    except KeyError:
+        if len(_PenCache) >= _MAX_CACHE_SIZE:
+            _PenCache.clear()
+        pen = _PenCache[key] = aggdraw.Pen(key[0], line_width)
+        return pen
+
+
+def get_brush(color, opacity=255):
+    """Return a shared aggdraw brush
+
+    Args:
+        color (tuple): rgba color
+        opacity (int, optional): opacity of the brush
+    """
+    key = (tuple(color), opacity)
+    try:
+        return _BrushCache[key]
+    except KeyError:
+        if len(_BrushCache) >= _MAX_CACHE_SIZE:
+            _BrushCache.clear()
+        brush = _BrushCache[key] = aggdraw.Brush(key[0], opacity)
+        return brush
+
+
+def _copy_color(color):
+    # cheaper than Color(color), which parses its arguments again
+    if color is None:
+        return None
+    copy = Color.__new__(Color)
+    copy.__dict__.update(color.__dict__)
+    return copy
 
 
 class Style(object):
-    """docstring for Style"""
+    """Drawing style of an element
+
+    Pen and brush are created lazily and kept until one of the attributes is
+    re-assigned or a color is modified in place.
+
+    Attributes:
+        revision (int): changes whenever one of the attributes is re-assigned
+    """
     def __init__(self, color=None, fill_color=None, line_width=None, opacity=None):
         super(Style, self).__init__()
 
@@ -18,22 +75,89 @@ class Style(object):
         self.line_width = line_width if line_width is not None else 1
         self.opacity = opacity if opacity is not None else 255
 
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, val):
+        self._color = val
+        self._pen = None
+        self.revision = next(_Revisions)
+
+    @property
+    def fill_color(self):
+        return self._fill_color
+
+    @fill_color.setter
+    def fill_color(self, val):
+        self._fill_color = val
+        self._brush = None
+        self.revision = next(_Revisions)
+
+    @property
+    def line_width(self):
+        return self._line_width
+
+    @line_width.setter
+    def line_width(self, val):
+        self._line_width = val
+        self._pen = None
+        self.revision = next(_Revisions)
+
+    @property
+    def opacity(self):
+        return self._opacity
+
+    @opacity.setter
+    def opacity(self, val):
+        self._opacity = val
+        self._brush = None
+        self.revision = next(_Revisions)
+
+    @property
+    def key(self):
+        """Return a value which changes whenever the appearance of the style changes
+
+        Unlike `revision`, this includes colors modified in place.
+        """
+        return (self.revision,
+                self._color.rgb if self._color is not None else None,
+                self._fill_color.rgb if self._fill_color is not None else None)
+
     @property
     def pen(self):
-        if self.color is not None:
-            return aggdraw.Pen(self.color.rgb, self.line_width)
-        else:
+        if self._color is None:
             return None
+        # colors might be modified in place, compare the actual values
+        key = self._color.rgb
+        if self._pen is None or self._pen[0] != key:
+            self._pen = (key, get_pen(key, self._line_width))
+        return self._pen[1]
 
     @property
     def brush(self):
-        if self.fill_color is not None:
-            return aggdraw.Brush(self.fill_color.rgb, self.opacity)
-        else:
+        if self._fill_color is None:
             return None
+        key = self._fill_color.rgb
+        if self._brush is None or self._brush[0] != key:
+            self._brush = (key, get_brush(key, self._opacity))
+        return self._brush[1]
 
     def clone(self):
-        return copy.deepcopy(self)
+        # the clone shares pen and brush but owns its colors
+        style = Style.__new__(Style)
+        style.__dict__.update(self.__dict__)
+        style._color = _copy_color(self._color)
+        style._fill_color = _copy_color(self._fill_color)
+        return style
+
+    def __getstate__(self):
+        # native aggdraw objects can neither be copied nor pickled
+        state = self.__dict__.copy()
+        state['_pen'] = None
+        state['_brush'] = None
+        return state
 
     def __str__(self):
         s = []
@@ -20,37 +20,29 @@ WIDTH = 500
 FRAMES_MOVE = 30
 
 
-def visualize_state(X, C, assignments=None, show_lines=False):
-    colors = Color.scheme(NUM_CLUSTERS, start=2)
+COLORS = np.array([color.rgb for color in Color.scheme(NUM_CLUSTERS, start=2)])
+CENTROID_FILL = np.array([color.interpolate('white', 0.7).rgb for color in Color.scheme(NUM_CLUSTERS, start=2)])
 
+
+def create_scene(X, C):
+    """Create all elements once, each frame only updates their arrays
+    """
     with CoordinateSystem(xscale=1, yscale=1):
+        points = PointCloud(X, 1, style=Style(color='color3', fill_color='color3!0.9!white', line_width=0.5))
+        centroids = PointCloud(C, 3, colors=COLORS, fill_colors=CENTROID_FILL, style=Style(line_width=0.5))
+        lines = LineCollection(np.zeros((X.shape[0], 2, 2)), style=Style(line_width=1))
 
         scene = Scene()
-        if assignments is None:
-            # draw data points
-            with Scope(Circle, style=Style(color='color3', fill_color='color3!0.9!white', line_width=0.5)):
-                for x in X:
-                    scene.put(Circle(list(x), 1))
-        else:
-            def sty(c): return Style(color=c, fill_color=c, line_width=0.5)
-            for k in range(X.shape[0]):
-                scene.put(Circle(list(X[k]), 1, sty(colors[assignments[k]])))
-
-        # draw centroids
-        for k in range(NUM_CLUSTERS):
-            scene.put(Circle(list(C[k]), 3, Style(color=colors[k],
-                                                  fill_color=colors[k].interpolate('white', 0.7),
-                                                  line_width=0.5)))
+        scene.put([points, centroids, lines])
+        return scene, points, centroids, lines
 
-        # draw lines
-        if show_lines:
-            if assignments is not None:
-                for k in range(X.shape[0]):
-                    style = Style(color=colors[assignments[k]],
-                                  fill_color=colors[assignments[k]], line_width=1)
-                    scene.put(Line(list(C[assignments[k]]), list(X[k, :]), style))
 
-        return scene
+def visualize_state(X, C, assignments):
+    colors = COLORS[assignments]
+    points.update(colors=colors, fill_colors=colors)
+    centroids.update(positions=C)
+    lines.update(segments=np.stack([C[assignments], X], axis=1), colors=colors)
+    return scene
 
 
 X = np.random.randn(NUM_POINTS, 2)
@@ -66,7 +58,7 @@ def algorithm(X, C):
         # assign clusters
         ids = np.array([np.argmin([np.dot(x_i - y_k, x_i - y_k) for y_k in C]) for x_i in X])
 
-        yield visualize_state(X, C, assignments=ids, show_lines=True)
+        yield visualize_state(X, C, ids)
 
         # update cluster centers
         C_new = C.copy()
@@ -74,18 +66,16 @@ def algorithm(X, C):
             C_new[k] = X[ids == k].mean(axis=0)
 
         for t in ease.EaseOutCubic(FRAMES_MOVE).generate():
-            yield visualize_state(X, (1 - t) * C + t * C_new, assignments=ids, show_lines=True)
+            yield visualize_state(X, (1 - t) * C + t * C_new, ids)
 
         C = C_new.copy()
 
 
-with exporter.Mp4('kmeans.mp4', height=HEIGHT, width=WIDTH) as video:
-    cam = camera.Camera2D(height=HEIGHT, width=WIDTH)
-
-    for scene in algorithm(X, C):
-        video.add_frame(cam.render(scene))
-
+scene, points, centroids, lines = create_scene(X, C)
+cam = camera.Camera2D(height=HEIGHT, width=WIDTH)
 
-with exporter.Gif('kmeans.gif', height=HEIGHT, width=WIDTH, fps=30) as video:
+# render each frame once for both files
+with exporter.Tee(exporter.Mp4('kmeans.mp4', height=HEIGHT, width=WIDTH),
+                  exporter.Gif('kmeans.gif', height=HEIGHT, width=WIDTH, fps=30)) as video:
     for scene in algorithm(X, C):
         video.add_frame(cam.render(scene))